@@ -0,0 +1,252 @@
+"""Row markup for generate_timesheet.py.
+
+Kept fully annotated so it can be compiled with ``mypyc _rowgen.py``; a built
+extension is picked up in place of this file when present.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from html import escape
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # decimal is imported lazily: only explicit per-shift "hours" need it.
+    from decimal import Decimal
+
+
+def _esc(value: str | None) -> str:
+    # Most optional fields are empty, so skip html.escape's replace passes
+    # there. A JSON null renders as an empty field; any other non-string
+    # still raises, as html.escape does.
+    if value is None or value == "":
+        return ""
+    return escape(value)
+
+
+# Weekday labels need no escaping; looking them up skips _esc for nearly
+# every row.
+_DAY_HTML = {
+    day: _esc(day)
+    for day in (
+        "Sunday",
+        "Monday",
+        "Tuesday",
+        "Wednesday",
+        "Thursday",
+        "Friday",
+        "Saturday",
+    )
+}
+
+
+def format_hours(value: object) -> str:
+    if value in ("", None):
+        return ""
+    from decimal import Decimal, InvalidOperation
+
+    if isinstance(value, Decimal):
+        return f"{value:.2f}"
+    try:
+        return f"{Decimal(str(value)):.2f}"
+    except (InvalidOperation, ValueError):
+        return str(value)
+
+
+@lru_cache(maxsize=512)
+def _parse_hhmm(value: str) -> int | None:
+    # "H:MM"/"HH:MM" to minutes past midnight (hours unchecked, 0-99).
+    hours, sep, minutes = value.partition(":")
+    # isdigit() alone would also accept non-ASCII digits, which strptime rejects.
+    if not (sep and value.isascii() and hours.isdigit() and minutes.isdigit()):
+        return None
+    if len(hours) > 2 or len(minutes) > 2:
+        return None
+    hh, mm = int(hours), int(minutes)
+    if mm > 59:
+        return None
+    return hh * 60 + mm
+
+
+def to_24h(value: object) -> str:
+    if not value:
+        return ""
+    if not isinstance(value, str):
+        value = str(value)
+    # Fast path: JSON produced by the page is already zero-padded HH:MM.
+    if len(value) == 5 and value[2] == ":" and value.isascii():
+        hours, minutes = value[:2], value[3:]
+        if hours.isdigit() and minutes.isdigit():
+            if hours <= "23" and minutes <= "59":
+                return value
+    return _normalize_time(value)
+
+
+@lru_cache(maxsize=512)
+def _normalize_time(value: str) -> str:
+    # Slow path of to_24h, memoised: shifts cluster on a few distinct times.
+    cleaned = value.strip().upper().replace(" ", "")
+    suffix = None
+    if cleaned.endswith(("AM", "PM")):
+        suffix = cleaned[-2:]
+        cleaned = cleaned[:-2]
+    parsed = _parse_hhmm(cleaned)
+    if parsed is None:
+        return ""
+    hh, mm = divmod(parsed, 60)
+    if suffix is None:
+        if hh > 23:
+            return ""
+    else:
+        if not 1 <= hh <= 12:
+            return ""
+        if suffix == "PM" and hh != 12:
+            hh += 12
+        elif suffix == "AM" and hh == 12:
+            hh = 0
+    return f"{hh:02d}:{mm:02d}"
+
+
+@lru_cache(maxsize=512)
+def to_display_time(value: str) -> str:
+    if not value:
+        return "--"
+    parsed = _parse_hhmm(value)
+    if parsed is None or parsed >= 24 * 60:
+        return value
+    hh, mm = divmod(parsed, 60)
+    suffix = "AM" if hh < 12 else "PM"
+    return f"{(hh + 11) % 12 + 1:02d}:{mm:02d}{suffix}"
+
+
+def parse_decimal(value: object) -> Decimal | None:
+    if value in ("", None):
+        return None
+    from decimal import Decimal, InvalidOperation
+
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+@lru_cache(maxsize=512)
+def minutes_from_span(raw_start: str, raw_end: str) -> int:
+    start_minutes = _parse_hhmm(raw_start)
+    end_minutes = _parse_hhmm(raw_end)
+    if start_minutes is None or end_minutes is None:
+        return 0
+    if end_minutes < start_minutes:
+        end_minutes += 24 * 60
+    # Elapsed whole minutes; callers convert to hours only when formatting.
+    return max(end_minutes - start_minutes, 0)
+
+
+def format_minutes(minutes: int, hours: Decimal | None = None) -> str:
+    # `hours` carries any explicit per-shift hours from the JSON; without it
+    # the total is exact in integer minutes and never needs a Decimal.
+    if hours is None:
+        return f"{minutes / 60:.2f}"
+    from decimal import Decimal
+
+    return format_hours(Decimal(minutes) / Decimal(60) + hours)
+
+
+def build_rows(entries: list[dict]) -> tuple[str, str]:
+    parts: list[str] = []
+    total_minutes = 0
+    total_hours: Decimal | None = None
+
+    for index, entry in enumerate(entries):
+        day = entry.get("day", "")
+        day = _DAY_HTML.get(day) or _esc(day)
+        date = _esc(entry.get("date", ""))
+        shifts = entry.get("shifts") or []
+
+        end_entries: list[str] = []
+        day_minutes = 0
+        day_hours: Decimal | None = None
+
+        if not shifts:
+            shifts = [{}]
+
+        if index:
+            parts.append("\n          ")
+        # wrap_editable_value, inlined: an empty value renders the same span.
+        parts.append(
+            "<tr>"
+            f'<td><span data-editable="true">{day}</span></td>'
+            f'<td><span data-editable="true" data-date-cell="true" '
+            f'data-day-offset="{index}">{date}</span></td>'
+            "<td>"
+            f"<div class=\"shift-list\" data-day-index=\"{index}\" data-shift-side=\"start\">"
+        )
+
+        for shift_index, shift in enumerate(shifts):
+            raw_start = to_24h(shift.get("start") or "")
+            raw_end = to_24h(shift.get("end") or "")
+            # to_24h only yields "" or HH:MM, so neither the raw values nor
+            # their display forms can contain markup and need no escaping.
+            display_start = to_display_time(raw_start)
+            display_end = to_display_time(raw_end)
+
+            hours_value = parse_decimal(shift.get("hours"))
+            if hours_value is None:
+                day_minutes += minutes_from_span(raw_start, raw_end)
+            elif day_hours is None:
+                day_hours = hours_value
+            else:
+                day_hours += hours_value
+
+            parts.append(
+                f'<div class="shift-entry" data-day-index="{index}" '
+                f'data-shift-index="{shift_index}">'
+                f'<span data-shift-display="start" data-day-index="{index}" '
+                f'data-shift-index="{shift_index}" data-raw-value="{raw_start}">'
+                f"{display_start}</span>"
+                '<input class="time-input" type="time" data-shift-input="start" '
+                f'data-day-index="{index}" data-shift-index="{shift_index}" '
+                f'value="{raw_start}">'
+                '<button type="button" class="shift-remove" '
+                f'data-day-index="{index}" data-shift-index="{shift_index}">'
+                "&times;</button>"
+                "</div>"
+            )
+            end_entries.append(
+                f'<div class="shift-entry" data-day-index="{index}" '
+                f'data-shift-index="{shift_index}">'
+                f'<span data-shift-display="end" data-day-index="{index}" '
+                f'data-shift-index="{shift_index}" data-raw-value="{raw_end}">'
+                f"{display_end}</span>"
+                '<input class="time-input" type="time" data-shift-input="end" '
+                f'data-day-index="{index}" data-shift-index="{shift_index}" '
+                f'value="{raw_end}">'
+                "</div>"
+            )
+
+        total_minutes += day_minutes
+        if day_hours is not None:
+            total_hours = (
+                day_hours if total_hours is None else total_hours + day_hours
+            )
+        hours_display = format_minutes(day_minutes, day_hours)
+
+        parts.append(
+            "</div>"
+            f"<button type=\"button\" class=\"shift-add\" data-day-index=\"{index}\">+ Add Shift</button>"
+            "</td>"
+            "<td>"
+            f"<div class=\"shift-list\" data-day-index=\"{index}\" data-shift-side=\"end\">"
+        )
+        # End entries live in the next cell, so they are buffered per row and
+        # spliced in without an intermediate join.
+        parts.extend(end_entries)
+        parts.append(
+            "</div>"
+            "</td>"
+            f"<td class=\"hours\"><span data-day-hours=\"true\" data-hours-cell=\"true\" "
+            f"data-day-index=\"{index}\">{hours_display}</span></td>"
+            "</tr>"
+        )
+
+    return "".join(parts), format_minutes(total_minutes, total_hours)
@@ -1,28 +1,51 @@
 import argparse
 import json
-from datetime import datetime
-from decimal import Decimal, InvalidOperation
-from html import escape
+import re
+import sys
+from functools import lru_cache
 from pathlib import Path
 from string import Template
 
+# The row helpers live in _rowgen; the public ones are re-exported so
+# `from generate_timesheet import to_24h` and friends keep working.
+from _rowgen import (  # noqa: F401
+    _esc,
+    build_rows,
+    format_hours,
+    format_minutes,
+    minutes_from_span,
+    parse_decimal,
+    to_24h,
+    to_display_time,
+)
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used when it isn't installed
+    orjson = None
+
+DEFAULT_TEMPLATE = Path("timesheet_template (1).html")
+
+# 19+ digit runs can exceed orjson's 64-bit integers, which it turns into
+# floats; such files are parsed by json instead.
+_WIDE_NUMBER = re.compile(rb"\d{19}")
+
 
 def load_timesheet(path: Path) -> dict:
+    if orjson is not None:
+        raw = path.read_bytes()
+        # orjson is only a fast path: anything it rejects (NaN, Infinity) or
+        # might parse differently falls back to json, so both agree.
+        if not _WIDE_NUMBER.search(raw):
+            try:
+                return orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                pass
+        return json.loads(raw.decode("utf-8"))
     with path.open("r", encoding="utf-8") as handle:
         return json.load(handle)
 
 
-def format_hours(value) -> str:
-    if value in ("", None):
-        return ""
-    if isinstance(value, Decimal):
-        return f"{value:.2f}"
-    try:
-        return f"{Decimal(str(value)):.2f}"
-    except (InvalidOperation, ValueError):
-        return str(value)
-
-
 def wrap_editable_value(value: str, extra_attrs: str = "") -> str:
     if not value:
         return f'<span data-editable="true"{extra_attrs}></span>'
@@ -39,12 +62,9 @@ def wrap_editable_lines(values, extra_attrs: str = "") -> str:
 
 def build_title_payload(single, multiple=None) -> tuple[str, str]:
     def normalize(values):
-        normalized = []
-        for value in values:
-            text = str(value).strip()
-            if text and text not in normalized:
-                normalized.append(text)
-        return normalized
+        return list(
+            dict.fromkeys(text for value in values if (text := str(value).strip()))
+        )
 
     collected = []
     if multiple:
@@ -61,160 +81,67 @@ def build_title_payload(single, multiple=None) -> tuple[str, str]:
     if not titles:
         return ("--", "")
 
-    display = "<br>".join(escape(title) for title in titles)
+    display = "<br>".join(_esc(title) for title in titles)
     values = "|".join(titles)
     return display, values
 
 
-def to_24h(value: str) -> str:
-    if not value:
-        return ""
-    cleaned = value.strip().upper().replace(" ", "")
-    for fmt in ("%I:%M%p", "%H:%M"):
-        try:
-            parsed = datetime.strptime(cleaned, fmt)
-            return parsed.strftime("%H:%M")
-        except ValueError:
-            continue
-    return ""
-
-
-def to_display_time(value: str) -> str:
-    if not value:
-        return "--"
-    try:
-        parsed = datetime.strptime(value, "%H:%M")
-        return parsed.strftime("%I:%M%p")
-    except ValueError:
-        return value
-
+def _compile_template(text: str) -> tuple[list[str], list[tuple[str, str]]]:
+    # Split the template into literal chunks around each $placeholder so a
+    # render is just list indexing and a join.  Each key keeps its original
+    # source text, which is emitted unchanged when the payload lacks that key
+    # (matching Template.safe_substitute, e.g. for `${...}` in the inline JS).
+    literals = []
+    keys = []
+    chunk = []
+    position = 0
+    for match in Template.pattern.finditer(text):
+        chunk.append(text[position : match.start()])
+        position = match.end()
+        name = match.group("named") or match.group("braced")
+        if name is not None:
+            literals.append("".join(chunk))
+            keys.append((name, match.group()))
+            chunk = []
+        elif match.group("escaped") is not None:
+            chunk.append(match.group("escaped"))
+        else:
+            chunk.append(match.group())
+    chunk.append(text[position:])
+    literals.append("".join(chunk))
+    return literals, keys
 
-def parse_decimal(value) -> Decimal | None:
-    if value in ("", None):
-        return None
-    try:
-        return Decimal(str(value))
-    except (InvalidOperation, ValueError):
-        return None
-
-
-def hours_from_span(raw_start: str, raw_end: str) -> Decimal:
-    def to_minutes(value: str) -> int | None:
-        if not value:
-            return None
-        parts = value.split(":")
-        if len(parts) != 2:
-            return None
-        try:
-            hours, minutes = int(parts[0]), int(parts[1])
-        except ValueError:
-            return None
-        return hours * 60 + minutes
-
-    start_minutes = to_minutes(raw_start)
-    end_minutes = to_minutes(raw_end)
-    if start_minutes is None or end_minutes is None:
-        return Decimal("0")
-    if end_minutes < start_minutes:
-        end_minutes += 24 * 60
-    elapsed = max(end_minutes - start_minutes, 0)
-    return Decimal(elapsed) / Decimal(60)
-
-
-def build_rows(entries):
-    rows = []
-    total = Decimal("0")
-
-    for index, entry in enumerate(entries):
-        day = escape(entry.get("day", ""))
-        date = escape(entry.get("date", ""))
-        shifts = entry.get("shifts") or []
-
-        start_entries = []
-        end_entries = []
-        day_total = Decimal("0")
-
-        if not shifts:
-            shifts = [{}]
-
-        for shift_index, shift in enumerate(shifts):
-            raw_start = to_24h(str(shift.get("start", "")))
-            raw_end = to_24h(str(shift.get("end", "")))
-            display_start = escape(to_display_time(raw_start))
-            display_end = escape(to_display_time(raw_end))
-
-            hours_value = parse_decimal(shift.get("hours"))
-            if hours_value is None:
-                hours_value = hours_from_span(raw_start, raw_end)
-            day_total += hours_value
-
-            start_entries.append(
-                "<div class=\"shift-entry\" "
-                f"data-day-index=\"{index}\" data-shift-index=\"{shift_index}\">"
-                f"<span data-shift-display=\"start\" data-day-index=\"{index}\" "
-                f"data-shift-index=\"{shift_index}\" data-raw-value=\"{raw_start}\">"
-                f"{display_start}</span>"
-                f"<input class=\"time-input\" type=\"time\" data-shift-input=\"start\" "
-                f"data-day-index=\"{index}\" data-shift-index=\"{shift_index}\" "
-                f"value=\"{raw_start}\">"
-                "<button type=\"button\" class=\"shift-remove\" "
-                f"data-day-index=\"{index}\" data-shift-index=\"{shift_index}\">&times;</button>"
-                "</div>"
-            )
 
-            end_entries.append(
-                "<div class=\"shift-entry\" "
-                f"data-day-index=\"{index}\" data-shift-index=\"{shift_index}\">"
-                f"<span data-shift-display=\"end\" data-day-index=\"{index}\" "
-                f"data-shift-index=\"{shift_index}\" data-raw-value=\"{raw_end}\">"
-                f"{display_end}</span>"
-                f"<input class=\"time-input\" type=\"time\" data-shift-input=\"end\" "
-                f"data-day-index=\"{index}\" data-shift-index=\"{shift_index}\" "
-                f"value=\"{raw_end}\">"
-                "</div>"
-            )
+@lru_cache(maxsize=8)
+def _get_template(
+    path: Path, mtime: float
+) -> tuple[list[str], list[tuple[str, str]]]:
+    # mtime is part of the cache key so edits to the template are picked up.
+    return _compile_template(path.read_text(encoding="utf-8"))
 
-        total += day_total
-        hours_display = format_hours(day_total) if day_total else "0.00"
-
-        rows.append(
-            "<tr>"
-            f"<td>{wrap_editable_value(day)}</td>"
-            f"<td>{wrap_editable_value(date, f' data-date-cell=\"true\" data-day-offset=\"{index}\"')}</td>"
-            f"<td>"
-            f"<div class=\"shift-list\" data-day-index=\"{index}\" data-shift-side=\"start\">"
-            f"{''.join(start_entries)}"
-            "</div>"
-            f"<button type=\"button\" class=\"shift-add\" data-day-index=\"{index}\">+ Add Shift</button>"
-            "</td>"
-            f"<td>"
-            f"<div class=\"shift-list\" data-day-index=\"{index}\" data-shift-side=\"end\">"
-            f"{''.join(end_entries)}"
-            "</div>"
-            "</td>"
-            f"<td class=\"hours\"><span data-day-hours=\"true\" data-hours-cell=\"true\" "
-            f"data-day-index=\"{index}\">{hours_display}</span></td>"
-            "</tr>"
-        )
 
-    return "\n          ".join(rows), format_hours(total)
+def _iter_chunks(template, payload: dict):
+    literals, keys = template
+    yield literals[0]
+    for index, (key, raw) in enumerate(keys):
+        yield payload.get(key, raw)
+        yield literals[index + 1]
 
 
-def render(template_path: Path, data: dict) -> str:
-    template = Template(template_path.read_text(encoding="utf-8"))
+def build_payload(data: dict) -> dict:
     rows, total_hours = build_rows(data.get("entries", []))
     title_display, title_values = build_title_payload(
         data.get("employee_title", ""), data.get("employee_titles")
     )
     payload = {
-        "client_name": escape(data.get("client_name", "")),
-        "employee_name": escape(data.get("employee_name", "")),
+        "client_name": _esc(data.get("client_name", "")),
+        "employee_name": _esc(data.get("employee_name", "")),
         "employee_title_display": title_display,
-        "employee_title_values": escape(title_values),
-        "employee_phone": escape(data.get("employee_phone", "")),
-        "employee_email": escape(data.get("employee_email", "")),
-        "week_start": escape(data.get("week_start", "")),
-        "week_end": escape(data.get("week_end", "")),
+        "employee_title_values": _esc(title_values),
+        "employee_phone": _esc(data.get("employee_phone", "")),
+        "employee_email": _esc(data.get("employee_email", "")),
+        "week_start": _esc(data.get("week_start", "")),
+        "week_end": _esc(data.get("week_end", "")),
         "rows": rows,
         "total_hours": total_hours,
     }
@@ -222,47 +149,141 @@ def render(template_path: Path, data: dict) -> str:
     signatures = data.get("signatures", {})
     payload.update(
         {
-            "employee_signature": escape(signatures.get("employee_signature", "")),
-            "employee_signature_date": escape(
+            "employee_signature": _esc(signatures.get("employee_signature", "")),
+            "employee_signature_date": _esc(
                 signatures.get("employee_signature_date", "")
             ),
-            "supervisor_signature": escape(
+            "supervisor_signature": _esc(
                 signatures.get("supervisor_signature", "")
             ),
-            "supervisor_signature_date": escape(
+            "supervisor_signature_date": _esc(
                 signatures.get("supervisor_signature_date", "")
             ),
         }
     )
 
-    return template.safe_substitute(payload)
+    return payload
+
+
+def _render_chunks(template_path: Path, data: dict):
+    # The template and payload are resolved here, eagerly, so any error is
+    # raised before a caller opens (and truncates) its output file.
+    # Keyed on the resolved path so a cwd change can't hit a stale entry.
+    template_path = template_path.resolve()
+    template = _get_template(template_path, template_path.stat().st_mtime)
+    return _iter_chunks(template, build_payload(data))
+
+
+def render(template_path: Path, data: dict) -> str:
+    return "".join(_render_chunks(template_path, data))
+
+
+def render_one(data_path: Path, template_path: Path, output_path: Path) -> Path:
+    chunks = _render_chunks(template_path, load_timesheet(data_path))
+    with output_path.open("w", encoding="utf-8", buffering=1 << 16) as handle:
+        handle.writelines(chunks)
+    return output_path
+
+
+def _job_count(value: str) -> int:
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {jobs}")
+    return jobs
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Generate an HTML timesheet from JSON data."
     )
-    parser.add_argument("data", type=Path, help="Path to timesheet JSON file.")
+    parser.add_argument(
+        "data", type=Path, nargs="+", help="Path(s) to timesheet JSON files."
+    )
     parser.add_argument(
         "-t",
         "--template",
         type=Path,
-        default=Path("timesheet_template (1).html"),
+        default=DEFAULT_TEMPLATE,
         help="Path to the HTML template file.",
     )
     parser.add_argument(
         "-o",
         "--output",
         type=Path,
-        default=Path("timesheet.html"),
-        help="Where to write the rendered HTML.",
+        default=None,
+        help=(
+            "Where to write the rendered HTML (default: timesheet.html). With "
+            "several inputs this is a directory, and each sheet is named after "
+            "its JSON file (default: next to each input)."
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=_job_count,
+        default=None,
+        help="Worker processes for several inputs (default: CPU count).",
     )
 
     args = parser.parse_args()
 
-    data = load_timesheet(args.data)
-    html = render(args.template, data)
-    args.output.write_text(html, encoding="utf-8")
+    if len(args.data) == 1:
+        render_one(args.data[0], args.template, args.output or Path("timesheet.html"))
+        return
+
+    # Checked once up front, so a bad template is reported as such rather than
+    # as a failure of every input.
+    try:
+        args.template.stat()
+    except OSError as exc:
+        parser.error(f"cannot read template {args.template}: {exc.strerror}")
+
+    if args.output is not None and args.output.exists() and not args.output.is_dir():
+        parser.error(
+            f"with several inputs -o must be a directory, but {args.output} is a file"
+        )
+
+    if args.output is not None:
+        outputs = [args.output / path.with_suffix(".html").name for path in args.data]
+    else:
+        outputs = [path.with_suffix(".html") for path in args.data]
+
+    seen = {}
+    for data_path, output_path in zip(args.data, outputs):
+        key = output_path.resolve()
+        if key in seen:
+            parser.error(
+                f"{seen[key]} and {data_path} would both be written to {output_path}"
+            )
+        seen[key] = data_path
+
+    if args.output is not None:
+        args.output.mkdir(parents=True, exist_ok=True)
+
+    # Imported here: it pulls in multiprocessing, which single-sheet runs
+    # would otherwise pay for at startup.
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Each worker compiles the template once via _get_template's cache and
+    # reuses it for every sheet it is handed.
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [
+            executor.submit(render_one, data_path, args.template, output_path)
+            for data_path, output_path in zip(args.data, outputs)
+        ]
+        # A bad sheet is reported against its input; the rest still render.
+        for data_path, future in zip(args.data, futures):
+            try:
+                future.result()
+            except Exception as exc:
+                failed += 1
+                print(f"{parser.prog}: {data_path}: {exc}", file=sys.stderr)
+    if failed:
+        parser.exit(1, f"{parser.prog}: {failed} of {len(args.data)} sheets failed\n")
 
 
 if __name__ == "__main__":